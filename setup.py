@@ -0,0 +1,15 @@
+import os
+
+from setuptools import setup
+
+ext_modules = []
+# Opt-in native build of the parser (the AST model stays pure Python). Needs mypy in the build environment:
+#   CEDARSCRIPT_USE_MYPYC=1 pip install --no-build-isolation .
+# Without it, only the pure-Python module is installed. A compiled install has no fallback to it:
+# the extension needs its cedarscript_ast_parser__mypyc library, and the import fails if that's missing.
+if os.environ.get('CEDARSCRIPT_USE_MYPYC') == '1':
+    from mypyc.build import mypycify
+
+    ext_modules = mypycify(['src/cedarscript_ast_parser/cedarscript_ast_parser.py'])
+
+setup(ext_modules=ext_modules)
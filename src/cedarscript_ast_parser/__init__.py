@@ -1,17 +1,19 @@
 __version__ = "0.1.5"
 
-from .cedarscript_ast_parser import (
-    CEDARScriptASTParser, ParseError, Command,
+from .cedarscript_ast_parser import CEDARScriptASTParser, ParseError, ScriptEdit
+from .model import (
+    Command,
     CreateCommand, RmFileCommand, MvFileCommand, UpdateCommand,
     SelectCommand, IdentifierFromFile, SingleFileClause, Segment, Marker, BodyOrWhole, MarkerType, RelativeMarker, RelativePositionType,
-    MoveClause, DeleteClause, InsertClause, ReplaceClause, EditingAction, Region, BodyOrWhole, WhereClause, RegionClause
+    MoveClause, DeleteClause, InsertClause, ReplaceClause, EditingAction, Region, WhereClause, RegionClause
 )
 
 __all__ = (
-    CEDARScriptASTParser, ParseError, Command,
-    CreateCommand, RmFileCommand, MvFileCommand, UpdateCommand,
-    SelectCommand, IdentifierFromFile, SingleFileClause, Segment, Marker, BodyOrWhole, MarkerType, RelativeMarker, RelativePositionType,
-    MoveClause, DeleteClause, InsertClause, ReplaceClause, EditingAction, Region, BodyOrWhole, WhereClause, RegionClause
+    'CEDARScriptASTParser', 'ParseError', 'Command',
+    'CreateCommand', 'RmFileCommand', 'MvFileCommand', 'UpdateCommand',
+    'SelectCommand', 'IdentifierFromFile', 'SingleFileClause', 'Segment', 'Marker', 'BodyOrWhole', 'MarkerType', 'RelativeMarker', 'RelativePositionType',
+    'MoveClause', 'DeleteClause', 'InsertClause', 'ReplaceClause', 'EditingAction', 'Region', 'WhereClause', 'RegionClause',
+    'ScriptEdit'
 )
 
 
@@ -1,9 +1,21 @@
-from enum import StrEnum, auto
-from typing import TypeAlias, NamedTuple, Union
+import logging
+import re
+from functools import cache, lru_cache
+from typing import Callable, Protocol, TypeAlias, NamedTuple, cast
 
-from tree_sitter import Parser
+from mypy_extensions import mypyc_attr
+from tree_sitter import Language, Node, Parser, Tree
 import cedarscript_grammar
-from dataclasses import dataclass
+
+# The model used to be defined here, so every name of it is still importable from this module
+from .model import (
+    BodyOrWhole, MarkerType, RelativePositionType, Marker, RelativeMarker, Segment, MarkerOrSegment, Region,
+    WhereClause, SingleFileClause, IdentifierFromFile, FileOrIdentifierWithin,
+    RegionClause, ReplaceClause, DeleteClause, InsertClause, MoveClause, EditingAction,
+    Command, FileCommand, CreateCommand, RmFileCommand, MvFileCommand, UpdateCommand, SelectCommand
+)
+
+logger = logging.getLogger(__name__)
 
 class ParseError(NamedTuple):
     command_ordinal: int
@@ -22,197 +34,49 @@ class ParseError(NamedTuple):
         )
 
 
-# <location>
-
-
-class BodyOrWhole(StrEnum):
-    BODY = auto()
-    WHOLE = auto()
-
-
-MarkerType = StrEnum('MarkerType', 'LINE VARIABLE FUNCTION CLASS')
-RelativePositionType = StrEnum('RelativePositionType', 'AT BEFORE AFTER INSIDE')
-
-@dataclass
-class Marker:
-    type: MarkerType
-    value: str
-    offset: int | None = None
-
-    def __str__(self):
-        result = f"{self.type.value} '{self.value}'"
-        if self.offset is not None:
-            result += f" at offset {self.offset}"
-        return result
-
-
-class RelativeMarker(Marker):
-    qualifier: RelativePositionType
-
-    def __init__(self, qualifier: RelativePositionType, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.qualifier = qualifier
-
-    def __str__(self):
-        result = super().__str__()
-        match self.qualifier:
-            case RelativePositionType.AT:
-                pass
-            case _:
-                result = f'{result} ({self.qualifier})'
-        return result
-
-
-@dataclass
-class Segment:
-    start: RelativeMarker
-    end: RelativeMarker
-
-    def __str__(self):
-        return f"segment from {self.start} to {self.end}"
-
-
-MarkerOrSegment: TypeAlias = Marker | Segment
-Region: TypeAlias = BodyOrWhole | MarkerOrSegment
-RegionOrRelativeMarker: Region | RelativeMarker
-# <file-or-identifier>
-
-
-@dataclass
-class WhereClause:
-    field: str
-    operator: str
-    value: str
-
-
-@dataclass
-class SingleFileClause:
-    file_path: str
+# Lookup tables, to avoid going through EnumMeta.__call__ for every parsed node.
+# They're keyed by member name, which is spelled exactly like the grammar's keyword token (BODY, LINE, AFTER, ...)
+_BODY_OR_WHOLE = {e.name: e for e in BodyOrWhole}
+_MARKER_TYPE = {e.name: e for e in MarkerType}
+_RELATIVE_POSITION_TYPE = {e.name: e for e in RelativePositionType}
 
+# (start_byte, old_end_byte, new_end_byte, start_point, old_end_point, new_end_point), as in `Tree.edit`
+ScriptEdit: TypeAlias = tuple[int, int, int, tuple[int, int], tuple[int, int], tuple[int, int]]
 
-@dataclass
-class IdentifierFromFile(SingleFileClause):
-    where_clause: WhereClause
-    identifier_type: str  # VARIABLE, FUNCTION, CLASS
-    offset: int | None = None
-
-    def __str__(self):
-        result = f"{self.identifier_type.lower()} (self.where_clause)"
-        if self.offset is not None:
-            result += f" at offset {self.offset}"
-        return f"{result} from file {self.file_path}"
-
-
-FileOrIdentifierWithin: TypeAlias = SingleFileClause | IdentifierFromFile
-
-# </file-or-identifier>
-
-# </location>
-
-
-# <editing-clause>
-
-@dataclass
-class RegionClause:
-    region: Region
-
-
-@dataclass
-class ReplaceClause(RegionClause):
-    pass
-
-
-@dataclass
-class DeleteClause(RegionClause):
-    pass
-
-
-@dataclass
-class InsertClause:
-    insert_position: RelativeMarker
-
-
-@dataclass
-class MoveClause(DeleteClause, InsertClause):
-    to_other_file: SingleFileClause | None = None
-    relative_indentation: int | None = None
-
-
-EditingAction: TypeAlias = ReplaceClause | DeleteClause | InsertClause | MoveClause
-
-# </editing-clause>
-
-
-# <command>
-
-@dataclass
-class Command:
-    type: str
 
+class _Node(Protocol):
+    """
+    The parts of `tree_sitter.Node` used to parse a command.
+    Scripts with syntax errors never get this far, so the children required by the grammar are typed as present.
+    """
     @property
-    def files_to_change(self) -> tuple[str, ...]:
-        return ()
-
-# <file-command>
-
-
-@dataclass
-class FileCommand(Command):
-    file_path: str
-
+    def type(self) -> str: ...
     @property
-    def files_to_change(self) -> tuple[str, ...]:
-        return (self.file_path,)
-
-
-@dataclass
-class CreateCommand(FileCommand):
-    content: str
-
-@dataclass
-class RmFileCommand(FileCommand):
-    pass
-
-
-@dataclass
-class MvFileCommand(FileCommand):
-    target_path: str
-
+    def text(self) -> bytes: ...
     @property
-    def files_to_change(self) -> tuple[str, ...]:
-        return super().files_to_change + (self.target_path,)
-
-# </file-command>
-
-
-@dataclass
-class UpdateCommand(Command):
-    target: FileOrIdentifierWithin
-    action: EditingAction
-    content: str | None = None
-
+    def start_byte(self) -> int: ...
     @property
-    def files_to_change(self) -> tuple[str, ...]:
-        result = (self.target.file_path,)
-        match self.action:
-            case MoveClause(to_other_file=target_file):
-                if target_file:
-                    result += (target_file,)
-        return result
-
+    def end_byte(self) -> int: ...
+    @property
+    def children(self) -> list['_Node']: ...
+    @property
+    def named_children(self) -> list['_Node']: ...
+    def child(self, index: int) -> '_Node': ...
+    def named_child(self, index: int) -> '_Node': ...
+    def child_by_field_name(self, name: str) -> '_Node | None': ...
 
-@dataclass
-# TODO
-class SelectCommand(Command):
-    target: Union['FileNamesPathsTarget', 'OtherTarget']
-    source: Union['SingleFileClause', 'MultiFileClause']
-    where_clause: WhereClause | None = None
-    limit: int | None = None
 
+# Candidate node types for lookups that take the first child matching any of them
+_UPDATE_TARGET_TYPES = frozenset({'singlefile_clause', 'identifier_from_file'})
+_UPDATE_ACTION_TYPES = frozenset({
+    'update_delete_region_clause', 'update_delete_mos_clause', 'update_move_region_clause', 'update_move_mos_clause',
+    'insert_clause', 'replace_mos_clause', 'replace_region_clause'
+})
+_REGION_TYPES = frozenset({'marker_or_segment', 'region_field'})
+_CONTENT_TYPES = frozenset({'string', 'relative_indent_block', 'multiline_string'})
 
-# </command>
 
-def _generate_suggestion(error_node, code_text) -> str:
+def _generate_suggestion(error_node: Node, code_text: str | bytes) -> str:
     """
     Generates a suggestion based on the context of the error.
     """
@@ -232,25 +96,134 @@ def _generate_suggestion(error_node, code_text) -> str:
     return f"Please check the syntax near the error (parent node: {parent_type})"
 
 
+# Whitespace and `--` comments only (possessive, so a failed match never backtracks)
+_BLANK_OR_COMMENTS = re.compile(rb'(?:\s++|--[^\r\n]*+)*+')
+
+
+def _has_no_commands(source: bytes) -> bool:
+    """
+    Tells whether the (UTF-8) script is empty or made only of blank lines and comments.
+    The scan stops at the first character that is neither, without copying the script.
+    """
+    return _BLANK_OR_COMMENTS.fullmatch(source) is not None
+
+
+@lru_cache(maxsize=128)
+def _parse_small_int(text: bytes) -> int:
+    """
+    Converts the text of a `number` node to an int.
+    Offsets and indentation levels repeat a lot (0, 1, -1...), hence the cache.
+    """
+    return int(text)
+
+
+def _first_child_of_type(nodes: list[_Node], child_type: str) -> _Node | None:
+    """
+    Same as `CEDARScriptASTParser.find_first_by_type` for a single type, for the static parsing helpers.
+    """
+    for child in nodes:
+        if child.type == child_type:
+            return child
+    return None
+
+
+@cache
+def _load_language() -> Language:
+    """
+    Loads the native CEDARScript language only once per process.
+    `cedarscript_grammar.language()` logs a warning (and resets its own logger level) on every call,
+    so caching it also keeps that out of parser construction.
+    """
+    return cedarscript_grammar.language()
+
+
+# Both parser classes are native classes in the mypyc build, which can only be subclassed in Python if allowed
+@mypyc_attr(allow_interpreted_subclasses=True)
 class _CEDARScriptASTParserBase:
-    def __init__(self):
+    def __init__(self) -> None:
         """Load the CEDARScript language, and initialize the parser.
         """
         self.parser = Parser()
-        self.parser.set_language(cedarscript_grammar.language())
+        self.parser.set_language(_load_language())
+        # UTF-8 source of the script being parsed, so node contents can be sliced from it directly
+        self._source: bytes = b''
+        # Tree of the last parsed script, reused by incremental parsing
+        self._last_tree: Tree | None = None
 
 
+@mypyc_attr(allow_interpreted_subclasses=True)
 class CEDARScriptASTParser(_CEDARScriptASTParserBase):
-    def parse_script(self, code_text: str) -> tuple[list[Command], list[ParseError]]:
+    def __init__(self) -> None:
+        super().__init__()
+        # Dispatch tables mapping a node type to the method that parses it
+        self._command_parsers: dict[str, Callable[[_Node], Command]] = {
+            'create_command': self.parse_create_command,
+            'rm_file_command': self.parse_rm_file_command,
+            'mv_file_command': self.parse_mv_file_command,
+            'update_command': self.parse_update_command,
+            # 'select_command': self.parse_select_command,
+        }
+        self._update_target_parsers: dict[str, Callable[[_Node], FileOrIdentifierWithin]] = {
+            'singlefile_clause': self.parse_singlefile_clause,
+            'identifier_from_file': self.parse_identifier_from_file,
+        }
+        self._update_action_parsers: dict[str, Callable[[_Node], EditingAction]] = {
+            'update_delete_mos_clause': self.parse_delete_clause,
+            'update_delete_region_clause': self.parse_delete_clause,
+            'update_move_mos_clause': self.parse_move_clause,
+            'update_move_region_clause': self.parse_move_clause,
+            'insert_clause': self.parse_insert_clause,
+            'replace_mos_clause': self.parse_replace_clause,
+            'replace_region_clause': self.parse_replace_clause,
+        }
+        self._region_parsers: dict[str, Callable[[_Node], MarkerOrSegment]] = {
+            'marker': self.parse_marker,
+            'lineMarker': self.parse_marker,
+            'segment': self.parse_segment,
+        }
+
+    def parse_script(self, code_text: str | bytes) -> tuple[list[Command], list[ParseError]]:
         """
-        Parses the CEDARScript code and returns a tuple containing:
+        Parses the CEDARScript code (either a `str` or its UTF-8 `bytes`) and returns a tuple containing:
         - A list of Command objects if parsing is successful.
         - A list of ParseError objects if there are parsing errors.
         """
+        return self._parse_script(code_text)
+
+    def parse_script_incremental(
+            self, code_text: str | bytes, edits: list[ScriptEdit]
+    ) -> tuple[list[Command], list[ParseError]]:
+        """
+        Same as `parse_script`, but for a new version of the previously parsed script.
+        The given edits, which turned the previous script into `code_text`, are applied to the last tree
+        so that Tree-sitter only has to re-parse the regions that changed.
+        Without a previous tree, a full parse is done.
+        """
+        old_tree = self._last_tree
+        if old_tree is not None:
+            for edit in edits:
+                old_tree.edit(*edit)
+        return self._parse_script(code_text, old_tree)
+
+    def _parse_script(
+            self, code_text: str | bytes, old_tree: Tree | None = None
+    ) -> tuple[list[Command], list[ParseError]]:
         command_ordinal = 1
+        # Forget the previous tree first, so it can't outlive a script that fails before being parsed
+        self._last_tree = None
         try:
-            # Parse the code text
-            tree = self.parser.parse(bytes(code_text, 'utf8'))
+            # Encode the code text only if the caller didn't already provide UTF-8 bytes.
+            # The same buffer is then used for parsing and for slicing node contents.
+            self._source = code_text.encode('utf-8') if isinstance(code_text, str) else code_text or b''
+            if _has_no_commands(self._source):
+                # Skip parsing entirely when there's nothing to parse
+                return [], []
+
+            # tree-sitter 0.21 rejects an explicit None as the old tree
+            tree = (
+                self.parser.parse(self._source, old_tree) if old_tree is not None else self.parser.parse(self._source)
+            )
+            self._last_tree = tree
             root_node = tree.root_node
 
             errors = self._collect_parse_errors(root_node, code_text, command_ordinal)
@@ -259,15 +232,16 @@ class CEDARScriptASTParser(_CEDARScriptASTParserBase):
                 return [], errors
 
             # Extract commands from the parse tree
-            commands = []
-            for child in root_node.children:
-                node_type = child.type.casefold()
-                if node_type == 'comment':
-                    print("(COMMENT) " + self.parse_string(child).removeprefix("--").strip())
-                if not node_type.endswith('_command'):
-                    continue
-                commands.append(self.parse_command(child))
-                command_ordinal += 1
+            commands: list[Command] = []
+            # Commands and comments are direct children of the root, so there's no need to walk the whole tree
+            log_comments = logger.isEnabledFor(logging.DEBUG)
+            for child in cast(list[_Node], root_node.children):
+                node_type = child.type
+                if node_type.endswith('_command'):
+                    commands.append(self.parse_command(child))
+                    command_ordinal += 1
+                elif log_comments and node_type == 'comment':
+                    logger.debug("(COMMENT) %s", self.parse_string(child).removeprefix("--").strip())
 
             return commands, []
         except Exception as e:
@@ -282,40 +256,54 @@ class CEDARScriptASTParser(_CEDARScriptASTParserBase):
             )
             return [], [error]
 
-    def _collect_parse_errors(self, node, code_text, command_ordinal: int) -> list[ParseError]:
+    def _collect_parse_errors(self, node: Node, code_text: str | bytes, command_ordinal: int) -> list[ParseError]:
         """
-        Recursively traverses the syntax tree to collect parse errors.
+        Walks the syntax tree with a tree cursor to collect parse errors.
+        Subtrees whose root has no error are skipped without being visited
+        (`has_error` is also set for MISSING nodes and their ancestors).
         """
-        errors = []
-        if node.has_error:
-            if node.type == 'ERROR':
-                # Get the line and column numbers
-                start_point = node.start_point  # (row, column)
-                line = start_point[0] + 1       # Line numbers start at 1
-                column = start_point[1] + 1     # Columns start at 1
-
-                # Extract the erroneous text
-                error_text = code_text[node.start_byte:node.end_byte].strip()
-
-                # Create a helpful error message
-                message = f"Syntax error near '{error_text}' at line {line}, column {column}."
-                suggestion = _generate_suggestion(node, code_text)
-
-                error = ParseError(
-                    command_ordinal=command_ordinal,
-                    message=message,
-                    line=line,
-                    column=column,
-                    suggestion=suggestion
-                )
-                errors.append(error)
-
-            # Recurse into children to find all errors
-            for child in node.children:
-                errors.extend(self._collect_parse_errors(child, code_text, command_ordinal))
+        errors: list[ParseError] = []
+        cursor = node.walk()
+        visited_children = False
+        while True:
+            if not visited_children:
+                node = cursor.node
+                if node.has_error:
+                    if node.is_error:
+                        # Get the line and column numbers
+                        start_point = node.start_point  # (row, column)
+                        line = start_point[0] + 1       # Line numbers start at 1
+                        column = start_point[1] + 1     # Columns start at 1
+
+                        # Extract the erroneous text
+                        error_text = self._source[node.start_byte:node.end_byte].decode('utf8', 'replace').strip()
+
+                        # Create a helpful error message
+                        message = f"Syntax error near '{error_text}' at line {line}, column {column}."
+                        suggestion = _generate_suggestion(node, code_text)
+
+                        error = ParseError(
+                            command_ordinal=command_ordinal,
+                            message=message,
+                            line=line,
+                            column=column,
+                            suggestion=suggestion
+                        )
+                        errors.append(error)
+
+                    # Descend to find nested errors
+                    if cursor.goto_first_child():
+                        continue
+
+            if cursor.goto_next_sibling():
+                visited_children = False
+            elif cursor.goto_parent():
+                visited_children = True
+            else:
+                break
         return errors
 
-    def _get_expected_tokens(self, error_node) -> list[str]:
+    def _get_expected_tokens(self, error_node: Node) -> list[str]:
         """
         Provides expected tokens based on the error_node's context.
         """
@@ -324,63 +312,51 @@ class CEDARScriptASTParser(_CEDARScriptASTParserBase):
         # For now, we'll return an empty list to simplify.
         return []
 
-    def parse_command(self, node):
-        match node.type:
-            case 'create_command':
-                return self.parse_create_command(node)
-            case 'rm_file_command':
-                return self.parse_rm_file_command(node)
-            case 'mv_file_command':
-                return self.parse_mv_file_command(node)
-            case 'update_command':
-                return self.parse_update_command(node)
-            # case 'select_command':
-            #     return self.parse_select_command(node)
-            case _:
-                raise ValueError(f"Unexpected command type: {node.type}")
+    def parse_command(self, node: _Node) -> Command:
+        command_parser = self._command_parsers.get(node.type)
+        if command_parser is None:
+            raise ValueError(f"Unexpected command type: {node.type}")
+        return command_parser(node)
 
-    def parse_create_command(self, node):
-        file_path = self.parse_singlefile_clause(self.find_first_by_type(node.children, 'singlefile_clause')).file_path
-        content = self.parse_content_clause(self.find_first_by_type(node.children, 'content_clause'))
+    def parse_create_command(self, node: _Node) -> CreateCommand:
+        children = self._index_children(node)
+        file_path = self.parse_singlefile_clause(children.get('singlefile_clause')).file_path
+        content = self.parse_content_clause(children.get('content_clause'))
         return CreateCommand(type='create', file_path=file_path, content=content)
 
-    def parse_rm_file_command(self, node):
+    def parse_rm_file_command(self, node: _Node) -> RmFileCommand:
         file_path = self.parse_singlefile_clause(self.find_first_by_type(node.children, 'singlefile_clause')).file_path
         return RmFileCommand(type='rm_file', file_path=file_path)
 
-    def parse_mv_file_command(self, node):
-        file_path = self.parse_singlefile_clause(self.find_first_by_type(node.children, 'singlefile_clause')).file_path
-        target_path = self.parse_to_value_clause(self.find_first_by_type(node.children, 'to_value_clause'))
+    def parse_mv_file_command(self, node: _Node) -> MvFileCommand:
+        children = self._index_children(node)
+        file_path = self.parse_singlefile_clause(children.get('singlefile_clause')).file_path
+        target_path = self.parse_to_value_clause(children.get('to_value_clause'))
         return MvFileCommand(type='mv_file', file_path=file_path, target_path=target_path)
 
-    def parse_update_command(self, node):
+    def parse_update_command(self, node: _Node) -> UpdateCommand:
         target = self.parse_update_target(node)
         action = self.parse_update_action(node)
         content = self.parse_update_content(node)
         return UpdateCommand(type='update', target=target, action=action, content=content)
 
-    def parse_update_target(self, node):
-        types = [
-            'singlefile_clause',
-            'identifier_from_file'
-        ]
-        target_node = self.find_first_by_type(node.named_children, types)
+    def parse_update_target(self, node: _Node) -> FileOrIdentifierWithin:
+        target_node = self.find_first_by_type(node.named_children, _UPDATE_TARGET_TYPES)
         if target_node is None:
             raise ValueError("No valid target found in update command")
 
-        match target_node.type.casefold():
-            case 'singlefile_clause':
-                return self.parse_singlefile_clause(target_node)
-            case 'identifier_from_file':
-                return self.parse_identifier_from_file(target_node)
-            case _ as invalid:
-                raise ValueError(f"[parse_update_target] Invalid target: {invalid}")
+        target_type = target_node.type
+        target_parser = self._update_target_parsers.get(target_type)
+        if target_parser is None:
+            raise ValueError(f"[parse_update_target] Invalid target: {target_type}")
+        return target_parser(target_node)
 
-    def parse_identifier_from_file(self, node):
-        identifier_type = node.children[0].type  # FUNCTION, CLASS, or VARIABLE
-        file_clause = self.find_first_by_type(node.named_children, 'singlefile_clause')
-        where_clause = self.find_first_by_type(node.named_children, 'where_clause')
-        offset_clause = self.find_first_by_type(node.named_children, 'offset_clause')
+    def parse_identifier_from_file(self, node: _Node) -> IdentifierFromFile:
+        identifier_type = node.child(0).type  # FUNCTION, CLASS, or VARIABLE
+        children = self._index_children(node)
+        file_clause = children.get('singlefile_clause')
+        where_clause = children.get('where_clause')
+        offset_clause = children.get('offset_clause')
 
         if not file_clause or not where_clause:
             raise ValueError("Invalid identifier_from_file clause")
@@ -392,46 +368,49 @@ class CEDARScriptASTParser(_CEDARScriptASTParserBase):
         return IdentifierFromFile(identifier_type=identifier_type, file_path=file_path,
                                   where_clause=where, offset=offset)
 
-    def parse_where_clause(self, node):
-        condition = self.find_first_by_type(node.children, 'condition')
+    def parse_where_clause(self, node: _Node) -> WhereClause:
+        condition = node.child_by_field_name('condition') or self.find_first_by_type(node.named_children, 'condition')
         if not condition:
             raise ValueError("No condition found in where clause")
 
-        field = self.parse_string(self.find_first_by_type(condition.children, 'conditions_left'))
-        operator = self.parse_string(self.find_first_by_type(condition.children, 'operator'))
-        value = self.parse_string(self.find_first_by_type(condition.children, 'string'))
+        children = self._index_children(condition)
+        field_node = children.get('conditions_left')
+        operator_node = children.get('operator')
+        value_node = condition.child_by_field_name('value_or_pattern') or children.get('string')
+        if field_node is None or operator_node is None or value_node is None:
+            raise ValueError("Incomplete condition in where clause")
+        field = self.parse_string(field_node)
+        operator = self.parse_string(operator_node)
+        value = self.parse_string(value_node)
 
         return WhereClause(field=field, operator=operator, value=value)
 
-    def parse_update_action(self, node):
-        child_types = ['update_delete_region_clause', 'update_delete_mos_clause', 'update_move_region_clause', 'update_move_mos_clause',
-                                                     'insert_clause', 'replace_mos_clause', 'replace_region_clause']
-        action_node = self.find_first_by_type(node.named_children, child_types)
+    def parse_update_action(self, node: _Node) -> EditingAction:
+        action_node = self.find_first_by_type(node.named_children, _UPDATE_ACTION_TYPES)
         if action_node is None:
             raise ValueError("No valid action found in update command")
 
-        match action_node.type:
-            case 'update_delete_mos_clause' | 'update_delete_region_clause':
-                return self.parse_delete_clause(action_node)
-            case 'update_move_mos_clause' | 'update_move_region_clause':
-                return self.parse_move_clause(action_node)
-            case 'insert_clause':
-                return self.parse_insert_clause(action_node)
-            case 'replace_mos_clause' | 'replace_region_clause':
-                return self.parse_replace_clause(action_node)
-            case _ as invalid:
-                raise ValueError(f'[parse_update_action] Invalid: {invalid}')
-
-    def parse_delete_clause(self, node):
-        region = self.parse_region(self.find_first_by_type(node.named_children, ['marker_or_segment', 'region_field']))
+        action_parser = self._update_action_parsers.get(action_node.type)
+        if action_parser is None:
+            raise ValueError(f'[parse_update_action] Invalid: {action_node.type}')
+        return action_parser(action_node)
+
+    def parse_delete_clause(self, node: _Node) -> DeleteClause:
+        region = self.parse_region(self.find_first_by_type(node.named_children, _REGION_TYPES))
         return DeleteClause(region=region)
 
-    def parse_move_clause(self, node):
-        source = self.parse_region(self.find_first_by_type(node.named_children, ['marker_or_segment', 'region_field']))
-        destination = self.find_first_by_type(node.named_children, 'update_move_clause_destination')
-        insert_clause = self.find_first_by_type(destination.named_children, 'insert_clause')
-        insert_clause = self.parse_insert_clause(insert_clause)
-        rel_indent = self.parse_relative_indentation(self.find_first_by_type(destination.named_children, 'relative_indentation'))
+    def parse_move_clause(self, node: _Node) -> MoveClause:
+        named_children = node.named_children
+        source = self.parse_region(self.find_first_by_type(named_children, _REGION_TYPES))
+        destination_node = self.find_first_by_type(named_children, 'update_move_clause_destination')
+        if destination_node is None:
+            raise ValueError("No destination found in move clause")
+        destination = self._index_children(destination_node)
+        insert_clause_node = destination.get('insert_clause')
+        if insert_clause_node is None:
+            raise ValueError("No insert clause found in move clause destination")
+        insert_clause = self.parse_insert_clause(insert_clause_node)
+        rel_indent = self.parse_relative_indentation(destination.get('relative_indentation'))
         # TODO to_other_file
         return MoveClause(
             region=source,
@@ -439,93 +418,111 @@ class CEDARScriptASTParser(_CEDARScriptASTParserBase):
             relative_indentation=rel_indent
         )
 
-    def parse_insert_clause(self, node) -> InsertClause:
-        relative_marker = self.find_first_by_type(node.children, 'relpos_bai')
-        relative_marker: RelativeMarker = self.parse_region(relative_marker)
+    def parse_insert_clause(self, node: _Node) -> InsertClause:
+        relative_marker = cast(RelativeMarker, self.parse_region(self.find_first_by_type(node.children, 'relpos_bai')))
         # TODO check relative_marker type
         return InsertClause(insert_position=relative_marker)
 
-    def parse_replace_clause(self, node):
-        region = self.parse_region(self.find_first_by_type(node.named_children, ['marker_or_segment', 'region_field']))
+    def parse_replace_clause(self, node: _Node) -> ReplaceClause:
+        region = self.parse_region(self.find_first_by_type(node.named_children, _REGION_TYPES))
         return ReplaceClause(region=region)
 
-    def parse_region(self, node) -> Region:
-        qualifier = None
-        match node.type.casefold():
+    def parse_region(self, node: _Node | None) -> Region:
+        if node is None:
+            raise ValueError("[parse_region] No region found")
+        qualifier: RelativePositionType | None = None
+        match node.type:
             case 'marker_or_segment':
-                node = node.named_children[0]
+                node = node.named_child(0)
             case 'region_field':
-                node = node.children[0]
-                if node.type.casefold() == 'marker_or_segment':
-                    node = node.named_children[0]
+                node = node.child(0)
+                if node.type == 'marker_or_segment':
+                    node = node.named_child(0)
             case 'relpos_bai':
-                node = node.named_children[0]
-                qualifier = RelativePositionType(node.child(0).type.casefold())
-                node = node.named_children[0]
+                node = node.named_child(0)
+                qualifier = _RELATIVE_POSITION_TYPE[node.child(0).type]
+                node = node.named_child(0)
             case 'relpos_beforeafter':
-                qualifier = RelativePositionType(node.child(0).type.casefold())
-                node = node.named_children[0]
+                qualifier = _RELATIVE_POSITION_TYPE[node.child(0).type]
+                node = node.named_child(0)
             case 'relpos_at':
-                node = node.named_children[0]
-
-        match node.type.casefold():
-            case 'marker' | 'linemarker':
-                result = self.parse_marker(node)
-            case 'segment':
-                result = self.parse_segment(node)
-            case BodyOrWhole.BODY | BodyOrWhole.WHOLE as bow:
-                result = BodyOrWhole(bow.lower())
-            case _ as invalid:
-                raise ValueError(f"[parse_region] Unexpected node type: {invalid}")
+                node = node.named_child(0)
+
+        node_type = node.type
+        result: Region
+        if node_type in _BODY_OR_WHOLE:
+            result = _BODY_OR_WHOLE[node_type]
+        else:
+            region_parser = self._region_parsers.get(node_type)
+            if region_parser is None:
+                raise ValueError(f"[parse_region] Unexpected node type: {node_type}")
+            result = region_parser(node)
         if qualifier:
-            result = RelativeMarker(qualifier=qualifier, type=result.type, value=result.value, offset=result.offset)
+            marker = cast(Marker, result)
+            result = RelativeMarker(qualifier=qualifier, type=marker.type, value=marker.value, offset=marker.offset)
         return result
 
-    def parse_marker(self, node) -> Marker:
+    def parse_marker(self, node: _Node) -> Marker:
         # TODO Fix: handle line marker as well
-        if node.type.casefold() == 'marker':
-            node = node.named_children[0]
-        marker_type = node.children[0].type  # LINE, VARIABLE, FUNCTION, or CLASS
-        value = self.parse_string(self.find_first_by_type(node.named_children, 'string'))
-        offset = self.parse_offset_clause(self.find_first_by_type(node.named_children, 'offset_clause'))
-        return Marker(type=MarkerType(marker_type.casefold()), value=value, offset=offset)
-
-    def parse_segment(self, node) -> Segment:
-        relpos_start = self.find_first_by_type(node.named_children, 'relpos_segment_start').children[1]
-        relpos_end = self.find_first_by_type(node.named_children, 'relpos_segment_end').children[1]
-        start: RelativeMarker = self.parse_region(relpos_start)
-        end: RelativeMarker = self.parse_region(relpos_end)
+        if node.type == 'marker':
+            node = node.named_child(0)
+        marker_type = node.child(0).type  # LINE, VARIABLE, FUNCTION, or CLASS
+        children = self._index_children(node)
+        value_node = children.get('string')
+        if value_node is None:
+            raise ValueError(f"No value found in {marker_type} marker")
+        value = self.parse_string(value_node)
+        offset = self.parse_offset_clause(children.get('offset_clause'))
+        return Marker(type=_MARKER_TYPE[marker_type], value=value, offset=offset)
+
+    def parse_segment(self, node: _Node) -> Segment:
+        children = self._index_children(node)
+        segment_start = children.get('relpos_segment_start')
+        segment_end = children.get('relpos_segment_end')
+        if segment_start is None or segment_end is None:
+            raise ValueError("Segment needs both a start (STARTING) and an end (ENDING)")
+        relpos_start = segment_start.child(1)
+        relpos_end = segment_end.child(1)
+        start = cast(Marker, self.parse_region(relpos_start))
+        end = cast(Marker, self.parse_region(relpos_end))
         return Segment(start=start, end=end)
 
-    def parse_offset_clause(self, node):
+    @staticmethod
+    def parse_offset_clause(node: _Node | None) -> int | None:
         if node is None:
             return None
-        return int(self.find_first_by_type(node.children, 'number').text)
+        number = node.child_by_field_name('offset') or _first_child_of_type(node.children, 'number')
+        if number is None:
+            raise ValueError("No number found in offset_clause")
+        return _parse_small_int(number.text)
 
-    def parse_relative_indentation(self, node):
+    @staticmethod
+    def parse_relative_indentation(node: _Node | None) -> int | None:
         if node is None:
             return None
-        return int(self.find_first_by_type(node.children, 'number').text)
+        number = node.child_by_field_name('rel_indent') or _first_child_of_type(node.children, 'number')
+        if number is None:
+            raise ValueError("No number found in relative_indentation")
+        return _parse_small_int(number.text)
 
-    def parse_update_content(self, node):
+    def parse_update_content(self, node: _Node) -> str | None:
         content_clause = self.find_first_by_type(node.children, 'content_clause')
         if content_clause:
             return self.parse_content_clause(content_clause)
         return None
 
-    def parse_singlefile_clause(self, node):
+    def parse_singlefile_clause(self, node: _Node | None) -> SingleFileClause:
         if node is None or node.type != 'singlefile_clause':
             raise ValueError("Expected singlefile_clause node")
-        path_node = self.find_first_by_type(node.children, 'string')
+        path_node = node.child_by_field_name('path') or self.find_first_by_type(node.children, 'string')
         if path_node is None:
             raise ValueError("No file_path found in singlefile_clause")
         return SingleFileClause(file_path=self.parse_string(path_node))
 
-    def parse_content_clause(self, node):
+    def parse_content_clause(self, node: _Node | None) -> str:
         if node is None or node.type != 'content_clause':
             raise ValueError("Expected content_clause node")
-        child_type = ['string', 'relative_indent_block', 'multiline_string']
-        content_node = self.find_first_by_type(node.children, child_type)
+        content_node = node.child_by_field_name('content') or self.find_first_by_type(node.children, _CONTENT_TYPES)
         if content_node is None:
             raise ValueError("No content found in content_clause")
         if content_node.type == 'string':
@@ -534,45 +531,63 @@ class CEDARScriptASTParser(_CEDARScriptASTParserBase):
             return self.parse_relative_indent_block(content_node)
         elif content_node.type == 'multiline_string':
             return self.parse_multiline_string(content_node)
+        raise ValueError(f"Unexpected content type: {content_node.type}")
 
-    def parse_to_value_clause(self, node):
+    def parse_to_value_clause(self, node: _Node | None) -> str:
         if node is None or node.type != 'to_value_clause':
             raise ValueError("Expected to_value_clause node")
-        value_node = self.find_first_by_type(node.children, 'string')
+        value_node = node.child_by_field_name('value') or self.find_first_by_type(node.children, 'string')
         if value_node is None:
             raise ValueError("No value found in to_value_clause")
         return self.parse_string(value_node)
 
-    def parse_string(self, node):
-        match node.type.casefold():
+    def parse_string(self, node: _Node) -> str:
+        match node.type:
             case 'string':
-                node = node.named_children[0]
-        text = node.text.decode('utf8')
-        match node.type.casefold():
-            case 'raw_string':
-                text = text.strip('"\'')
-            case 'single_quoted_string':
-                text = text.replace("\\'", "'").replace('\\"', '"').strip('"\'')
-            case 'multi_line_string':
-                text = text.removeprefix("'''").removeprefix('"""').removesuffix("'''").removesuffix('"""')
+                node = node.named_child(0)
+        match node.type:
+            case 'raw_string' | 'single_quoted_string' | 'multi_line_string' as string_type:
+                # The opening and closing quotes are the first and last tokens of the string,
+                # so its content can be decoded straight from the source in a single slice
+                children = node.children
+                text = self._source[children[0].end_byte:children[-1].start_byte].decode('utf8')
+                if string_type == 'single_quoted_string':
+                    text = text.replace("\\'", "'").replace('\\"', '"')
+            case _:
+                text = node.text.decode('utf8')
 
         return text
 
-    def parse_multiline_string(self, node):
-        return node.text.decode('utf8').strip("'''").strip('"""')
+    def parse_multiline_string(self, node: _Node) -> str:
+        # Only remove the enclosing triple quotes (not every quote char at both ends), decoding in one slice
+        start, end = node.start_byte, node.end_byte
+        quotes = self._source[start:start + 3]
+        if end - start >= 6 and quotes in (b"'''", b'"""') and self._source[end - 3:end] == quotes:
+            start, end = start + 3, end - 3
+        return self._source[start:end].decode('utf8')
 
-    def parse_relative_indent_block(self, node):
-        lines = []
+    def parse_relative_indent_block(self, node: _Node) -> str:
+        lines: list[str] = []
         for line_node in node.children:
             if line_node.type == 'relative_indent_line':
                 indent_prefix = self.find_first_by_type(line_node.children, 'relative_indent_prefix')
                 content = self.find_first_by_type(line_node.children, 'match_any_char')
                 if indent_prefix and content:
-                    indent = int(indent_prefix.text.strip('@:'))
-                    lines.append(f"{' ' * (4 * indent)}{content.text}")
+                    indent = int(indent_prefix.text.strip(b'@:'))
+                    lines.append(f"{' ' * (4 * indent)}{content.text.decode('utf8')}")
         return '\n'.join(lines)
 
-    def find_first_by_type(self, nodes: list[any], child_type):
+    def _index_children(self, node: _Node, named: bool = True) -> dict[str, _Node]:
+        """
+        Maps each child type to the first child of that type, in a single pass over the children.
+        """
+        children = node.named_children if named else node.children
+        return {child.type: child for child in reversed(children)}
+
+    @staticmethod
+    def find_first_by_type(nodes: list[_Node], child_type: str | list[str] | frozenset[str]) -> _Node | None:
+        if isinstance(child_type, (set, frozenset)):
+            return next((child for child in nodes if child.type in child_type), None)
         if isinstance(child_type, list):
             for child in nodes:
                 if child.type in child_type:
@@ -583,7 +598,7 @@ class CEDARScriptASTParser(_CEDARScriptASTParserBase):
                     return child
         return None
 
-    def find_first_by_field_name(self, node: any, field_names):
+    def find_first_by_field_name(self, node: _Node, field_names: str | list[str]) -> _Node | None:
         if not isinstance(field_names, list):
             return node.child_by_field_name(field_names)
 
@@ -0,0 +1,197 @@
+from dataclasses import dataclass
+from enum import StrEnum, auto
+from typing import TypeAlias, Union
+
+
+# <location>
+
+
+class BodyOrWhole(StrEnum):
+    BODY = auto()
+    WHOLE = auto()
+
+
+MarkerType = StrEnum('MarkerType', 'LINE VARIABLE FUNCTION CLASS')
+RelativePositionType = StrEnum('RelativePositionType', 'AT BEFORE AFTER INSIDE')
+
+@dataclass(slots=True, weakref_slot=True)
+class Marker:
+    type: MarkerType
+    value: str
+    offset: int | None = None
+
+    def __str__(self):
+        result = f"{self.type.value} '{self.value}'"
+        if self.offset is not None:
+            result += f" at offset {self.offset}"
+        return result
+
+
+class RelativeMarker(Marker):
+    __slots__ = ('qualifier',)
+    qualifier: RelativePositionType
+
+    def __init__(self, qualifier: RelativePositionType, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.qualifier = qualifier
+
+    def __str__(self):
+        result = super().__str__()
+        match self.qualifier:
+            case RelativePositionType.AT:
+                pass
+            case _:
+                result = f'{result} ({self.qualifier})'
+        return result
+
+
+@dataclass(slots=True, weakref_slot=True)
+class Segment:
+    # A plain Marker when the bound is given with AT
+    start: RelativeMarker | Marker
+    end: RelativeMarker | Marker
+
+    def __str__(self):
+        return f"segment from {self.start} to {self.end}"
+
+
+MarkerOrSegment: TypeAlias = Marker | Segment
+Region: TypeAlias = BodyOrWhole | MarkerOrSegment
+RegionOrRelativeMarker: Region | RelativeMarker
+# <file-or-identifier>
+
+
+@dataclass(slots=True, weakref_slot=True)
+class WhereClause:
+    field: str
+    operator: str
+    value: str
+
+
+@dataclass(slots=True, weakref_slot=True)
+class SingleFileClause:
+    file_path: str
+
+
+@dataclass(slots=True)
+class IdentifierFromFile(SingleFileClause):
+    where_clause: WhereClause
+    identifier_type: str  # VARIABLE, FUNCTION, CLASS
+    offset: int | None = None
+
+    def __str__(self):
+        result = f"{self.identifier_type.lower()} (self.where_clause)"
+        if self.offset is not None:
+            result += f" at offset {self.offset}"
+        return f"{result} from file {self.file_path}"
+
+
+FileOrIdentifierWithin: TypeAlias = SingleFileClause | IdentifierFromFile
+
+# </file-or-identifier>
+
+# </location>
+
+
+# <editing-clause>
+
+@dataclass(slots=True, weakref_slot=True)
+class RegionClause:
+    region: Region
+
+
+@dataclass(slots=True)
+class ReplaceClause(RegionClause):
+    pass
+
+
+@dataclass(slots=True)
+class DeleteClause(RegionClause):
+    pass
+
+
+# Not slotted: MoveClause also extends DeleteClause, and two slotted bases would conflict
+# (so MoveClause instances still get a __dict__)
+@dataclass
+class InsertClause:
+    insert_position: RelativeMarker
+
+
+@dataclass(slots=True)
+class MoveClause(DeleteClause, InsertClause):
+    to_other_file: SingleFileClause | None = None
+    relative_indentation: int | None = None
+
+
+EditingAction: TypeAlias = ReplaceClause | DeleteClause | InsertClause | MoveClause
+
+# </editing-clause>
+
+
+# <command>
+
+@dataclass(slots=True, weakref_slot=True)
+class Command:
+    type: str
+
+    @property
+    def files_to_change(self) -> tuple[str, ...]:
+        return ()
+
+# <file-command>
+
+
+@dataclass(slots=True)
+class FileCommand(Command):
+    file_path: str
+
+    @property
+    def files_to_change(self) -> tuple[str, ...]:
+        return (self.file_path,)
+
+
+@dataclass(slots=True)
+class CreateCommand(FileCommand):
+    content: str
+
+@dataclass(slots=True)
+class RmFileCommand(FileCommand):
+    pass
+
+
+@dataclass(slots=True)
+class MvFileCommand(FileCommand):
+    target_path: str
+
+    @property
+    def files_to_change(self) -> tuple[str, ...]:
+        # (zero-argument super() doesn't work in slotted dataclasses)
+        return self.file_path, self.target_path
+
+# </file-command>
+
+
+@dataclass(slots=True)
+class UpdateCommand(Command):
+    target: FileOrIdentifierWithin
+    action: EditingAction
+    content: str | None = None
+
+    @property
+    def files_to_change(self) -> tuple[str, ...]:
+        match self.action:
+            case MoveClause(to_other_file=SingleFileClause(file_path=target_path)):
+                return self.target.file_path, target_path
+        return (self.target.file_path,)
+
+
+@dataclass(slots=True)
+# TODO
+class SelectCommand(Command):
+    target: Union['FileNamesPathsTarget', 'OtherTarget']  # type: ignore[name-defined]
+    source: Union['SingleFileClause', 'MultiFileClause']  # type: ignore[name-defined]
+    where_clause: WhereClause | None = None
+    limit: int | None = None
+
+
+# </command>
@@ -0,0 +1,166 @@
+import logging
+import re
+from dataclasses import asdict
+
+import pytest
+
+from cedarscript_ast_parser import (
+    CEDARScriptASTParser, MvFileCommand, RmFileCommand, UpdateCommand, SingleFileClause, MoveClause, DeleteClause,
+    RelativeMarker, RelativePositionType, MarkerType, BodyOrWhole
+)
+from cedarscript_ast_parser.cedarscript_ast_parser import (
+    _BODY_OR_WHOLE, _MARKER_TYPE, _RELATIVE_POSITION_TYPE, _load_language
+)
+
+
+@pytest.fixture
+def parser():
+    return CEDARScriptASTParser()
+
+
+def test_lookup_table_keys_are_grammar_keyword_tokens():
+    # Node types are compared as spelled by the grammar, so each key must be one of its keyword tokens.
+    # Compiling a query fails on any token the grammar doesn't define.
+    tokens = (*_BODY_OR_WHOLE, *_MARKER_TYPE, *_RELATIVE_POSITION_TYPE)
+    _load_language().query('[' + ' '.join(f'"{token}"' for token in tokens) + '] @token')
+
+
+@pytest.mark.parametrize('script', [
+    "RM FILE 'a.py';\nMV FILE 'b.py' TO 'c.py';",
+    b"RM FILE 'a.py';\nMV FILE 'b.py' TO 'c.py';",
+])
+def test_parse_script(parser, script):
+    assert parser.parse_script(script) == (
+        [
+            RmFileCommand(type='rm_file', file_path='a.py'),
+            MvFileCommand(type='mv_file', file_path='b.py', target_path='c.py'),
+        ],
+        []
+    )
+
+
+@pytest.mark.parametrize('script', ["", "-- only a comment\n", b"\n  -- only a comment"])
+def test_parse_script_without_commands(parser, script):
+    assert parser.parse_script(script) == ([], [])
+
+
+_INCREMENTAL_SCRIPT = "RM FILE 'a.py';\nMV FILE 'b.py' TO 'c.py';"
+_INCREMENTAL_MV = MvFileCommand(type='mv_file', file_path='b.py', target_path='c.py')
+# Replaces 'a' (byte 9) with 'bb'
+_INCREMENTAL_EDIT = (9, 10, 11, (0, 9), (0, 10), (0, 11))
+
+
+@pytest.mark.parametrize('encode', [False, True])
+def test_parse_script_incremental(parser, encode):
+    def script(text: str) -> str | bytes:
+        return text.encode('utf-8') if encode else text
+
+    # Without a previous tree, a full parse is done
+    assert parser.parse_script_incremental(script(_INCREMENTAL_SCRIPT), []) == (
+        [RmFileCommand(type='rm_file', file_path='a.py'), _INCREMENTAL_MV], []
+    )
+    mv_node_id = parser._last_tree.root_node.named_child(2).id
+    edited_script = script(_INCREMENTAL_SCRIPT.replace('a.py', 'bb.py'))
+    assert parser.parse_script_incremental(edited_script, [_INCREMENTAL_EDIT]) == (
+        [RmFileCommand(type='rm_file', file_path='bb.py'), _INCREMENTAL_MV], []
+    )
+    # Tree-sitter reuses the subtrees the edit didn't touch only when it's given the (edited) old tree
+    assert parser._last_tree.root_node.named_child(2).id == mv_node_id
+
+
+def test_parse_script_incremental_after_failed_encoding(parser):
+    parser.parse_script(_INCREMENTAL_SCRIPT)
+    mv_node_id = parser._last_tree.root_node.named_child(2).id
+    # A lone surrogate can't be encoded, so this script never gets a tree
+    commands, errors = parser.parse_script("RM FILE '\ud800.py';")
+    assert commands == [] and len(errors) == 1
+    # The tree of the first script must not be reused after that
+    assert parser.parse_script_incremental(_INCREMENTAL_SCRIPT.replace('a.py', 'bb.py'), [_INCREMENTAL_EDIT]) == (
+        [RmFileCommand(type='rm_file', file_path='bb.py'), _INCREMENTAL_MV], []
+    )
+    assert parser._last_tree.root_node.named_child(2).id != mv_node_id
+
+
+def test_files_to_change():
+    mv = MvFileCommand(type='mv_file', file_path='a.py', target_path='b.py')
+    assert mv.files_to_change == ('a.py', 'b.py')
+    mv.target_path = 'c.py'
+    assert mv.files_to_change == ('a.py', 'c.py')
+    assert set(asdict(mv)) == {'type', 'file_path', 'target_path'}
+
+    move = MoveClause(
+        region=BodyOrWhole.WHOLE,
+        insert_position=RelativeMarker(qualifier=RelativePositionType.AFTER, type=MarkerType.LINE, value='1'),
+        to_other_file=SingleFileClause(file_path='b.py')
+    )
+    update = UpdateCommand(type='update', target=SingleFileClause(file_path='a.py'), action=move)
+    assert update.files_to_change == ('a.py', 'b.py')
+    update.action = DeleteClause(region=BodyOrWhole.WHOLE)
+    assert update.files_to_change == ('a.py',)
+
+
+def test_model_importable_from_parser_module():
+    from cedarscript_ast_parser import cedarscript_ast_parser, model
+    for name in ('SelectCommand', 'RegionClause', 'FileCommand', 'UpdateCommand', 'Segment'):
+        assert getattr(cedarscript_ast_parser, name) is getattr(model, name)
+
+
+def test_parse_script_logs_comments_at_debug_level(parser, caplog):
+    with caplog.at_level(logging.DEBUG, logger='cedarscript_ast_parser.cedarscript_ast_parser'):
+        assert parser.parse_script("-- remove it\nRM FILE 'a.py';") == (
+            [RmFileCommand(type='rm_file', file_path='a.py')], []
+        )
+    assert "(COMMENT) remove it" in caplog.messages
+
+
+def test_subclass_overrides_command_parser():
+    class Parser(CEDARScriptASTParser):
+        def parse_rm_file_command(self, node):
+            return RmFileCommand(type='rm_file', file_path='overridden')
+
+    assert Parser().parse_script("RM FILE 'a.py';") == ([RmFileCommand(type='rm_file', file_path='overridden')], [])
+
+
+@pytest.mark.parametrize('path_literal, file_path', [
+    (r"r'a\b.py'", r'a\b.py'),
+    ('r"a.py"', 'a.py'),
+    ("'say \"hi\"'", 'say "hi"'),
+    ('"it\'s.py"', "it's.py"),
+    (r"'it\'s.py'", "it's.py"),
+    ("'''\"q\".py'''", '"q".py'),
+])
+def test_parse_string_keeps_content_between_quotes(parser, path_literal, file_path):
+    assert parser.parse_script(f"RM FILE {path_literal};") == ([RmFileCommand(type='rm_file', file_path=file_path)], [])
+
+
+@pytest.mark.parametrize('literal, content', [
+    ("'''x'''", 'x'),
+    ("\"\"\"'quoted'\"\"\"", "'quoted'"),
+    ("'''\"\"x\"\"'''", '""x""'),
+    ("'''\"x'''", '"x'),
+])
+def test_parse_multiline_string_strips_only_enclosing_quotes(parser, literal, content):
+    # The grammar has no multiline_string node, so this is called directly on a triple-quoted string node
+    parser.parse_script(f"RM FILE {literal};")
+    path = parser._last_tree.root_node.named_child(0).named_child(0).child_by_field_name('path')
+    assert parser.parse_multiline_string(path) == content
+
+
+@pytest.mark.parametrize('encode', [False, True])
+def test_parse_error_quotes_text_of_non_ascii_script(parser, encode):
+    # Node offsets are in bytes, so the error text must be sliced from the UTF-8 source, not from the str
+    script = "RM FILE '日本語.py'; RM 'x';"
+    commands, errors = parser.parse_script(script.encode('utf-8') if encode else script)
+    assert commands == []
+    assert [error.message.split(' at line')[0] for error in errors] == ["Syntax error near 'RM 'x';'"]
+
+
+@pytest.mark.parametrize('method, message', [
+    ('parse_marker', "No value found in RM marker"),
+    ('parse_segment', "Segment needs both a start (STARTING) and an end (ENDING)"),
+])
+def test_unexpected_tree_raises_value_error(parser, method, message):
+    # A node lacking the children these methods look up (here, a whole RM command)
+    parser.parse_script("RM FILE 'a.py';")
+    with pytest.raises(ValueError, match=re.escape(message)):
+        getattr(parser, method)(parser._last_tree.root_node.named_child(0))